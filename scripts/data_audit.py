@@ -3,36 +3,58 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 import argparse
-import time
-from collections import Counter
-from dataclasses import dataclass
-from typing import Any, Dict, List, Optional, Tuple
+import json
+import random
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Sequence, Tuple
 
 import numpy as np
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional faster JSON codec
+    orjson = None
+    _loads = json.loads
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.settings import SETTINGS
 from src.data.clients import GammaClient, ClobPublic
 from src.data.clients import depth5_notional_proxy
+from src.rate_limit import TokenBucket
 
 
 # -----------------------------
 # Audit logic
 # -----------------------------
 
-VOL_KEYS_CANDIDATES = [
+VOL_KEYS_CANDIDATES = (
     "volume24hr", "volume24h", "volume_24h", "volumeUsd24h",
     "volume", "volumeUsd", "volume_usd",
-]
+)
 
-TOKEN_KEYS_CANDIDATES = [
+TOKEN_KEYS_CANDIDATES = (
     "clobTokenIds", "clob_token_ids", "tokenIds", "token_ids"
-]
+)
+
+
+# Keys the audit itself reads; always added to a --fields projection so open/closed
+# filtering and token/volume extraction keep working
+PROJECTION_REQUIRED_KEYS = ("id", "closed", "archived") + TOKEN_KEYS_CANDIDATES + VOL_KEYS_CANDIDATES
+
 
+def gamma_projection(fields: str) -> str:
+    """User field projection plus PROJECTION_REQUIRED_KEYS, deduplicated, user order first."""
+    keys = [k.strip() for k in fields.split(",") if k.strip()]
+    return ",".join(dict.fromkeys([*keys, *PROJECTION_REQUIRED_KEYS]))
 
-@dataclass
+
+@dataclass(slots=True)
 class AuditConfig:
     gamma_host: str
     clob_host: str
@@ -42,6 +64,31 @@ class AuditConfig:
     active_only: bool
     sleep_s: float
     topk_depth: int
+    max_concurrency: int = 8
+    page_concurrency: int = 4        # Gamma pages kept in flight
+    sample_n: int = 5                # raw market dicts kept for the schema printout
+    fields: Optional[str] = None     # Gamma field projection, e.g. "id,slug,clobTokenIds"
+    json_out: bool = False           # emit one machine-readable JSON report instead of text
+
+
+@dataclass(slots=True)
+class ClobProbe:
+    """Outcome of the order book / midpoint / spread calls for one token."""
+    ok_ob: bool = False
+    depth5: Optional[float] = None
+    mid: Optional[float] = None
+    spread: Optional[float] = None
+    errors: List[str] = field(default_factory=list)
+
+
+@lru_cache(maxsize=4096)
+def _parse_token_json(s: str) -> Optional[Tuple[str, ...]]:
+    """Memoized parse of a stringified token-id list; None if it is not a JSON list."""
+    try:
+        arr = _loads(s)
+    except Exception:
+        return None
+    return tuple(str(x) for x in arr) if isinstance(arr, list) else None
 
 
 def extract_token_ids(m: Dict[str, Any]) -> List[str]:
@@ -50,13 +97,9 @@ def extract_token_ids(m: Dict[str, Any]) -> List[str]:
         if isinstance(v, list) and v:
             return [str(x) for x in v]
         if isinstance(v, str) and v.strip().startswith("["):
-            try:
-                import json
-                arr = json.loads(v)
-                if isinstance(arr, list):
-                    return [str(x) for x in arr]
-            except Exception:
-                pass
+            ids = _parse_token_json(v)
+            if ids is not None:
+                return list(ids)
     return []
 
 
@@ -65,19 +108,155 @@ def extract_vol24h(m: Dict[str, Any]) -> Tuple[Optional[float], Optional[str]]:
     Returns (value, key_used)
     """
     for k in VOL_KEYS_CANDIDATES:
-        if k in m and m[k] is not None:
+        v = m.get(k)
+        if v is not None:
             try:
-                return float(m[k]), k
+                return float(v), k
             except Exception:
                 continue
     return None, None
 
 
+def iter_pages(gamma: GammaClient, cfg: AuditConfig, params: Dict[str, Any]) -> Iterator[List[Dict[str, Any]]]:
+    """
+    Yield Gamma pages in offset order while keeping up to cfg.page_concurrency
+    requests in flight. Stops at the first empty page, like sequential paging.
+    """
+    window = max(1, cfg.page_concurrency)
+    with ThreadPoolExecutor(max_workers=window) as pool:
+        pending: Deque[Future] = deque()
+        next_page = 0
+        while True:
+            while next_page < cfg.pages and len(pending) < window:
+                pending.append(pool.submit(gamma.get_markets, limit=cfg.limit, offset=next_page * cfg.limit, **params))
+                next_page += 1
+            if not pending:
+                return
+            markets = pending.popleft().result()
+            if not markets:
+                for fut in pending:
+                    fut.cancel()
+                return
+            yield markets
+
+
+def _try_read(fn: Callable[[str], Any], token_id: str, errors: List[str]) -> Any:
+    """fn(token_id), or None with the exception type recorded in errors."""
+    try:
+        return fn(token_id)
+    except Exception as e:
+        errors.append(type(e).__name__)
+        return None
+
+
+def probe_clob(clob: ClobPublic, token_id: str, topk_depth: int, limiter: Optional[TokenBucket] = None) -> ClobProbe:
+    """
+    Run the three public CLOB reads for a token. Never raises; failures are
+    recorded by exception type in probe.errors. limiter is shared by all
+    workers, so it paces the pool as a whole.
+    """
+    if limiter is not None:
+        limiter.acquire()
+    probe = ClobProbe()
+
+    try:
+        ob = clob.get_order_book(token_id)
+        probe.ok_ob = True
+        try:
+            d5 = depth5_notional_proxy(ob, k=topk_depth)
+            if d5 > 0:  # Only keep valid depth
+                probe.depth5 = d5
+        except Exception as e:
+            # Depth calculation failed, but order book fetch succeeded
+            probe.errors.append(type(e).__name__)
+    except Exception as e:
+        # Order book fetch failed
+        probe.errors.append(type(e).__name__)
+
+    probe.mid = _try_read(clob.get_midpoint, token_id, probe.errors)
+    probe.spread = _try_read(clob.get_spread, token_id, probe.errors)
+
+    return probe
+
+
+def order_stats(a: np.ndarray, qs: Sequence[float]) -> Tuple[np.ndarray, float]:
+    """
+    Linearly interpolated quantiles (as np.quantile) plus the max, from a
+    single np.partition call instead of one selection per statistic.
+    """
+    n = a.size
+    pos = np.asarray(qs, dtype=float) * (n - 1)
+    lo = np.floor(pos).astype(np.intp)
+    hi = np.ceil(pos).astype(np.intp)
+    part = np.partition(a, np.unique(np.concatenate([lo, hi, [n - 1]])))
+    q = part[lo] + (part[hi] - part[lo]) * (pos - lo)
+    return q, float(part[n - 1])
+
+
+def dist_stats(arr: Sequence[float]) -> Optional[Dict[str, float]]:
+    a = np.asarray(arr, dtype=float)
+    if a.size == 0:
+        return None
+    (p10, p50, p90), mx = order_stats(a, (0.10, 0.50, 0.90))
+    return {"n": int(a.size), "p10": float(p10), "p50": float(p50), "p90": float(p90), "max": mx}
+
+
+def reservoir_add(
+    bucket: List[Any],
+    item: Any,
+    seen: int,
+    k: int,
+    rng: random.Random,
+    project: Optional[Callable[[Any], Any]] = None,
+) -> None:
+    """
+    Algorithm R: keep a uniform sample of k items from a stream.
+    seen is the number of items observed before this one.
+    project, if given, is applied only to admitted items (what the bucket keeps).
+    """
+    if k <= 0:
+        return
+    if seen >= k:
+        j = rng.randrange(seen + 1)
+        if j >= k:
+            return
+    kept = project(item) if project is not None else item
+    if seen < k:
+        bucket.append(kept)
+    else:
+        bucket[j] = kept
+
+
 def safe_str(x: Any, maxlen: int = 110) -> str:
     s = str(x)
     return s if len(s) <= maxlen else s[:maxlen] + "..."
 
 
+SAMPLE_TEXT_KEYS = frozenset(("description", "rules", "question"))
+SAMPLE_META_KEYS = ("id", "slug", "active", "closed", "endDateIso", "end_date_iso")
+# Raw (untruncated) keys shown in samples: one hash lookup instead of three tuple scans
+SAMPLE_RAW_KEYS = frozenset(VOL_KEYS_CANDIDATES) | frozenset(TOKEN_KEYS_CANDIDATES) | frozenset(SAMPLE_META_KEYS)
+
+
+def sample_fields(m: Dict[str, Any]) -> Dict[str, Any]:
+    """The subset of a raw market shown in the schema sample."""
+    out: Dict[str, Any] = {}
+    for k in sorted(m.keys()):
+        if k in SAMPLE_TEXT_KEYS:
+            out[k] = safe_str(m.get(k))
+        elif k in SAMPLE_RAW_KEYS:
+            out[k] = m.get(k)
+    return out
+
+
+def write_json(report: Dict[str, Any]) -> None:
+    if orjson is not None:
+        sys.stdout.buffer.write(orjson.dumps(report, option=orjson.OPT_INDENT_2) + b"\n")
+    else:
+        sys.stdout.write(json.dumps(report, indent=2) + "\n")
+    sys.stdout.flush()
+
+
 def run_audit(cfg: AuditConfig) -> None:
     gamma = GammaClient(cfg.gamma_host)
     clob = ClobPublic(cfg.clob_host, cfg.chain_id)
@@ -94,100 +273,124 @@ def run_audit(cfg: AuditConfig) -> None:
     clob_total = 0
     clob_errors: Counter = Counter()
 
-    depth5_vals: List[float] = []
-    spread_vals: List[float] = []
-    mid_vals: List[float] = []
-
     sample_markets: List[Dict[str, Any]] = []
+    sample_rng = random.Random()
     open_markets_count = 0
 
-    for page in range(cfg.pages):
-        offset = page * cfg.limit
+    # CLOB reads are I/O bound: run them on a pool while Gamma pagination continues
+    probes: List[Future] = []
+    probe_by_token: Dict[str, Future] = {}  # one probe per token per run; repeats share it
+    with ThreadPoolExecutor(max_workers=max(1, cfg.max_concurrency)) as pool:
         params = {
             "closed": False,  # Only fetch open markets for CLOB testing
             "archived": False,
         }
         if cfg.active_only:
             params["active"] = True
-
-        markets = gamma.get_markets(limit=cfg.limit, offset=offset, **params)
-
-        if not markets:
-            break
-
-        for m in markets:
-            # record keys
-            for k in m.keys():
-                key_freq[k] += 1
-
-            # Track open markets
-            if not m.get("closed", True) and not m.get("archived", False):
-                open_markets_count += 1
-
-            tokens = extract_token_ids(m)
-            if tokens:
-                token_present += 1
-
-            vol, vol_key = extract_vol24h(m)
-            vol_total += 1
-            if vol is not None:
-                vol_present += 1
-                vol_key_freq[vol_key] += 1
-
-            # sample a few markets for printing
-            if len(sample_markets) < 10:
-                sample_markets.append(m)
-
-            # audit CLOB only if token id exists and market is open
-            if not tokens:
-                continue
-            if m.get("closed", True) or m.get("archived", False):
-                continue  # Skip closed/archived markets for CLOB testing
-
-            token_id = tokens[0]
-            clob_total += 1
-
-            try:
-                ob = clob.get_order_book(token_id)
+        if cfg.fields:
+            params["fields"] = gamma_projection(cfg.fields)
+
+        # Hot per-market loop: bind bound methods and config fields to locals once
+        count_keys = key_freq.update
+        submit = pool.submit
+        add_probe = probes.append
+        sample_n, topk_depth = cfg.sample_n, cfg.topk_depth
+        # --sleep is the spacing between token probes across the whole pool, as in the serial audit
+        limiter = TokenBucket(1.0 / cfg.sleep_s, 1) if cfg.sleep_s > 0 else None
+
+        for markets in iter_pages(gamma, cfg, params):
+            for m in markets:
+                # record keys
+                count_keys(m.keys())
+
+                # Track open markets
+                if not m.get("closed", True) and not m.get("archived", False):
+                    open_markets_count += 1
+
+                tokens = extract_token_ids(m)
+                if tokens:
+                    token_present += 1
+
+                vol, vol_key = extract_vol24h(m)
+                vol_total += 1
+                if vol is not None:
+                    vol_present += 1
+                    vol_key_freq[vol_key] += 1
+
+                # uniform sample of markets for printing (vol_total already counts m);
+                # keep only the shown fields so full raw dicts are not held to the end
+                reservoir_add(sample_markets, m, vol_total - 1, sample_n, sample_rng, project=sample_fields)
+
+                # audit CLOB only if token id exists and market is open
+                if not tokens:
+                    continue
+                if m.get("closed", True) or m.get("archived", False):
+                    continue  # Skip closed/archived markets for CLOB testing
+
+                token_id = tokens[0]
+                clob_total += 1
+                fut = probe_by_token.get(token_id)
+                if fut is None:
+                    fut = probe_by_token[token_id] = submit(probe_clob, clob, token_id, topk_depth, limiter)
+                add_probe(fut)
+
+        # At most one value per probe: fill pre-sized buffers, slice to the filled prefix
+        depth5_buf = np.empty(len(probes), dtype=np.float64)
+        spread_buf = np.empty(len(probes), dtype=np.float64)
+        mid_buf = np.empty(len(probes), dtype=np.float64)
+        n_depth5 = 0
+        for fut in probes:
+            probe = fut.result()
+            if probe.ok_ob:
                 clob_ok_ob += 1
-                try:
-                    d5 = depth5_notional_proxy(ob, k=cfg.topk_depth)
-                    if d5 > 0:  # Only append if we got valid depth
-                        depth5_vals.append(d5)
-                except Exception as e:
-                    # Depth calculation failed, but order book fetch succeeded
-                    error_type = type(e).__name__
-                    clob_errors[error_type] += 1
-            except Exception as e:
-                # Order book fetch failed
-                error_type = type(e).__name__
-                clob_errors[error_type] += 1
-
-            try:
-                mid = clob.get_midpoint(token_id)
-                if mid is not None:
-                    clob_ok_mid += 1
-                    mid_vals.append(mid)
-            except Exception as e:
-                error_type = type(e).__name__
-                clob_errors[error_type] += 1
-
-            try:
-                spr = clob.get_spread(token_id)
-                if spr is not None:
-                    clob_ok_spread += 1
-                    spread_vals.append(spr)
-            except Exception as e:
-                error_type = type(e).__name__
-                clob_errors[error_type] += 1
-
-            if cfg.sleep_s > 0:
-                time.sleep(cfg.sleep_s)
+            if probe.depth5 is not None:
+                depth5_buf[n_depth5] = probe.depth5
+                n_depth5 += 1
+            if probe.mid is not None:
+                mid_buf[clob_ok_mid] = probe.mid
+                clob_ok_mid += 1
+            if probe.spread is not None:
+                spread_buf[clob_ok_spread] = probe.spread
+                clob_ok_spread += 1
+            clob_errors.update(probe.errors)
+
+    depth5_vals = depth5_buf[:n_depth5]
+    spread_vals = spread_buf[:clob_ok_spread]
+    mid_vals = mid_buf[:clob_ok_mid]
 
     # -----------------------------
     # Reporting
     # -----------------------------
     total_markets_seen = vol_total
+    duplicate_tokens = len(probes) - len(probe_by_token)
+
+    if cfg.json_out:
+        write_json({
+            "gamma_host": cfg.gamma_host,
+            "clob_host": cfg.clob_host,
+            "chain_id": cfg.chain_id,
+            "markets_fetched": total_markets_seen,
+            "markets_with_token_ids": token_present,
+            "open_markets": open_markets_count,
+            "key_freq": dict(key_freq.most_common(30)),
+            "vol24h": {"present": vol_present, "total": vol_total, "keys": dict(vol_key_freq.most_common())},
+            "clob": {
+                "tested": clob_total,
+                "duplicate_tokens": duplicate_tokens,
+                "order_book_ok": clob_ok_ob,
+                "midpoint_ok": clob_ok_mid,
+                "spread_ok": clob_ok_spread,
+                "errors": dict(clob_errors.most_common()),
+            },
+            "distributions": {
+                f"depth{cfg.topk_depth}_notional": dist_stats(depth5_vals),
+                "spread": dist_stats(spread_vals),
+                "midpoint": dist_stats(mid_vals),
+            },
+            "samples": sample_markets,
+        })
+        return
+
     print("\n=== DATA AUDIT SUMMARY ===")
     print(f"Gamma host: {cfg.gamma_host}")
     print(f"CLOB  host: {cfg.clob_host} (chain_id={cfg.chain_id})")
@@ -213,6 +416,8 @@ def run_audit(cfg: AuditConfig) -> None:
     print("\n--- CLOB access quality (for open markets with token_ids) ---")
     if clob_total > 0:
         print(f"Markets tested: {clob_total}")
+        if duplicate_tokens:
+            print(f"Duplicate token ids (probed once, counted per market): {duplicate_tokens}")
         print(f"Order book success: {clob_ok_ob}/{clob_total} ({clob_ok_ob/max(clob_total,1):.1%})")
         print(f"Midpoint   success: {clob_ok_mid}/{clob_total} ({clob_ok_mid/max(clob_total,1):.1%})")
         print(f"Spread     success: {clob_ok_spread}/{clob_total} ({clob_ok_spread/max(clob_total,1):.1%})")
@@ -224,17 +429,17 @@ def run_audit(cfg: AuditConfig) -> None:
         print("No open markets with token IDs found; CLOB audit skipped.")
         print("Note: Try fetching more pages or check if markets are closed/archived.")
 
-    def summarize(arr: List[float], name: str) -> None:
-        if not arr:
+    def summarize(arr: np.ndarray, name: str) -> None:
+        st = dist_stats(arr)
+        if st is None:
             print(f"{name}: no data")
             return
-        a = np.asarray(arr, dtype=float)
         print(
-            f"{name}: n={len(a)} "
-            f"p10={np.quantile(a,0.10):.6g} "
-            f"p50={np.quantile(a,0.50):.6g} "
-            f"p90={np.quantile(a,0.90):.6g} "
-            f"max={a.max():.6g}"
+            f"{name}: n={st['n']} "
+            f"p10={st['p10']:.6g} "
+            f"p50={st['p50']:.6g} "
+            f"p90={st['p90']:.6g} "
+            f"max={st['max']:.6g}"
         )
 
     print("\n--- Basic distributions (proxies) ---")
@@ -243,14 +448,12 @@ def run_audit(cfg: AuditConfig) -> None:
     summarize(mid_vals, "Midpoint")
 
     # Print a compact sample of raw markets to inspect schema manually
-    print("\n--- Sample market objects (truncated) ---")
-    for i, m in enumerate(sample_markets[:5], start=1):
+    if sample_markets:
+        print("\n--- Sample market objects (truncated) ---")
+    for i, fields in enumerate(sample_markets, start=1):
         print(f"\nSample #{i}")
-        for k in sorted(m.keys()):
-            if k in ("description", "rules", "question"):
-                print(f"  {k}: {safe_str(m.get(k))}")
-            elif k in VOL_KEYS_CANDIDATES or k in TOKEN_KEYS_CANDIDATES or k in ("id", "slug", "active", "closed", "endDateIso", "end_date_iso"):
-                print(f"  {k}: {safe_str(m.get(k))}")
+        for k, v in fields.items():
+            print(f"  {k}: {safe_str(v)}")
 
     # Recommendations
     print("\n=== RECOMMENDATIONS ===")
@@ -277,8 +480,13 @@ def parse_args() -> AuditConfig:
     ap.add_argument("--pages", type=int, default=2, help="Number of pages to fetch")
     ap.add_argument("--limit", type=int, default=50, help="Markets per page")
     ap.add_argument("--active-only", action="store_true", help="Attempt to filter active markets")
-    ap.add_argument("--sleep", type=float, default=0.0, help="Sleep between CLOB calls (rate limiting)")
+    ap.add_argument("--sleep", type=float, default=0.0, help="Minimum seconds between token probes across all workers (rate limiting)")
     ap.add_argument("--topk-depth", type=int, default=5, help="Depth K levels for depth proxy")
+    ap.add_argument("--max-concurrency", type=int, default=8, help="Concurrent CLOB requests")
+    ap.add_argument("--page-concurrency", type=int, default=4, help="Gamma pages fetched concurrently")
+    ap.add_argument("--sample", type=int, default=5, help="Raw markets to print for schema inspection (0 = none)")
+    ap.add_argument("--fields", default=None, help="Comma-separated Gamma field projection (if supported by the server); id/closed/archived and token/volume keys are always included")
+    ap.add_argument("--json", action="store_true", help="Write a single JSON report to stdout instead of text")
     a = ap.parse_args()
     return AuditConfig(
         gamma_host=a.gamma_host,
@@ -289,6 +497,11 @@ def parse_args() -> AuditConfig:
         active_only=a.active_only,
         sleep_s=a.sleep,
         topk_depth=a.topk_depth,
+        max_concurrency=a.max_concurrency,
+        page_concurrency=a.page_concurrency,
+        sample_n=a.sample,
+        fields=a.fields,
+        json_out=a.json,
     )
 
 
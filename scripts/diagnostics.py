@@ -1,38 +1,65 @@
 import sys
 from pathlib import Path
 import requests
-from collections import Counter
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional faster JSON decoder
+    import json
+    _loads = json.loads
 
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from src.config.settings import SETTINGS
 
+# One pooled keep-alive session: repeated Gamma queries reuse the TCP+TLS connection.
+# Transient 5xx/429 are retried inside the adapter (honouring Retry-After).
+RETRY = Retry(
+    total=3,
+    backoff_factor=0.15,
+    status_forcelist=(429, 500, 502, 503, 504),
+    respect_retry_after_header=True,
+)
+SESSION = requests.Session()
+SESSION.mount("https://", HTTPAdapter(pool_connections=8, pool_maxsize=32, max_retries=RETRY))
+
 def fetch(params):
-    r = requests.get(f"{SETTINGS.GAMMA_HOST}/markets", params=params, timeout=20)
+    r = SESSION.get(f"{SETTINGS.GAMMA_HOST}/markets", params=params, timeout=20)
     r.raise_for_status()
-    return r.json()
+    return _loads(r.content)
+
+def _flag_counts(flags: np.ndarray) -> dict:
+    """Counter-style {value: count} for a bool array (first-seen order, zero counts omitted)."""
+    if flags.size == 0:
+        return {}
+    n_true = int(flags.sum())
+    counts = {True: n_true, False: flags.size - n_true}
+    first = bool(flags[0])
+    return {k: counts[k] for k in (first, not first) if counts[k]}
 
 def summarize(markets, label):
-    c_restricted = Counter()
-    c_closed = Counter()
-    c_archived = Counter()
-    c_active = Counter()
-    has_clob = 0
-    for m in markets:
-        c_restricted[bool(m.get("restricted", False))] += 1
-        c_closed[bool(m.get("closed", False))] += 1
-        c_archived[bool(m.get("archived", False))] += 1
-        c_active[bool(m.get("active", False))] += 1
-        if m.get("clobTokenIds"):
-            has_clob += 1
+    n = len(markets)
+    def flags(key):
+        return np.fromiter((bool(m.get(key, False)) for m in markets), dtype=bool, count=n)
+    c_restricted = _flag_counts(flags("restricted"))
+    c_closed = _flag_counts(flags("closed"))
+    c_archived = _flag_counts(flags("archived"))
+    c_active = _flag_counts(flags("active"))
+    has_clob = int(flags("clobTokenIds").sum())
 
     print(f"\n=== {label} ===")
     print("count:", len(markets))
-    print("active:", dict(c_active))
-    print("closed:", dict(c_closed))
-    print("archived:", dict(c_archived))
-    print("restricted:", dict(c_restricted))
+    print("active:", c_active)
+    print("closed:", c_closed)
+    print("archived:", c_archived)
+    print("restricted:", c_restricted)
     print("has clobTokenIds:", has_clob)
 
     print("\nExamples (first 5):")
@@ -49,20 +76,24 @@ def summarize(markets, label):
         })
 
 def main():
-    # Query A: as open as possible, ordered by volume24hr
-    params_a = {"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False}
-    mk_a = fetch(params_a)
-    summarize(mk_a, "A) /markets ordered by volume24hr (no filters)")
+    queries = [
+        # Query A: as open as possible, ordered by volume24hr
+        ({"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False},
+         "A) /markets ordered by volume24hr (no filters)"),
+        # Query B: explicitly closed=false (open)
+        ({"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False, "closed": False},
+         "B) /markets closed=false"),
+        # Query C: explicitly restricted=false
+        ({"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False, "closed": False, "restricted": False},
+         "C) /markets closed=false & restricted=false"),
+    ]
 
-    # Query B: explicitly closed=false (open)
-    params_b = {"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False, "closed": False}
-    mk_b = fetch(params_b)
-    summarize(mk_b, "B) /markets closed=false")
+    # The queries are independent: issue them together, report in order
+    with ThreadPoolExecutor(max_workers=len(queries)) as pool:
+        results = list(pool.map(fetch, [params for params, _ in queries]))
 
-    # Query C: explicitly restricted=false
-    params_c = {"limit": 50, "offset": 0, "order": "volume24hr", "ascending": False, "closed": False, "restricted": False}
-    mk_c = fetch(params_c)
-    summarize(mk_c, "C) /markets closed=false & restricted=false")
+    for (_, label), markets in zip(queries, results):
+        summarize(markets, label)
 
 if __name__ == "__main__":
     main()
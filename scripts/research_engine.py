@@ -1,9 +1,17 @@
 from __future__ import annotations
 
+import heapq
+import io
 import time
+from bisect import bisect_left, insort
 from collections import defaultdict, deque
-from dataclasses import dataclass
-from typing import Dict, Deque, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from operator import itemgetter
+from typing import Dict, Deque, List, Optional, Tuple
+
+import numpy as np
 
 import sys
 from pathlib import Path
@@ -18,19 +26,44 @@ from src.domain.bot_score import BotScoreInputs, botscore_v0, regime_from_score
 from src.strategies.a2_cascade import A2State, A2Params, a2_detect
 from src.storage.store import Store, SnapshotRow, BotScoreRow, SignalRow
 from src.execution.adapter import ExecutionAdapter, OrderIntent
+from src.rate_limit import TokenBucket
+
+
+class RollingWindow:
+    """
+    Bounded FIFO window that keeps a sorted copy of its contents.
+    append() is O(log n) search + O(n) shift on a small list; median() is an index lookup.
+    """
+    def __init__(self, maxlen: int = 30):
+        self.maxlen = maxlen
+        self._fifo: Deque[float] = deque()
+        self._sorted: List[float] = []
+
+    def __len__(self) -> int:
+        return len(self._fifo)
 
+    def append(self, x: float) -> None:
+        if len(self._fifo) >= self.maxlen:
+            old = self._fifo.popleft()
+            del self._sorted[bisect_left(self._sorted, old)]
+        self._fifo.append(x)
+        insort(self._sorted, x)
 
-@dataclass
+    def median(self) -> Optional[float]:
+        if not self._sorted:
+            return None
+        return self._sorted[len(self._sorted)//2]
+
+
+@dataclass(slots=True)
 class RollingMedians:
-    spreads: Deque[float]
-    depths: Deque[float]
+    spreads: RollingWindow = field(default_factory=RollingWindow)
+    depths: RollingWindow = field(default_factory=RollingWindow)
 
     def medians(self) -> Tuple[Optional[float], Optional[float]]:
         if not self.spreads or not self.depths:
             return None, None
-        ss = sorted(self.spreads)
-        dd = sorted(self.depths)
-        return ss[len(ss)//2], dd[len(dd)//2]
+        return self.spreads.median(), self.depths.median()
 
 
 def main() -> None:
@@ -49,11 +82,12 @@ def main() -> None:
             target_pos_frac=SETTINGS.TARGET_POS_FRAC,
         )
     )
+    S = screener.S()  # position size; fixed for the engine's lifetime
 
     # Per-market rolling state
     last_mid: Dict[str, Optional[float]] = {}
     a2_state: Dict[str, A2State] = {}
-    rolling: Dict[str, RollingMedians] = defaultdict(lambda: RollingMedians(deque(maxlen=30), deque(maxlen=30)))
+    rolling: Dict[str, RollingMedians] = defaultdict(lambda: RollingMedians(RollingWindow(maxlen=30), RollingWindow(maxlen=30)))
 
     a2_params = A2Params(
         spread_mult=SETTINGS.A2_SPREAD_MULT,
@@ -61,6 +95,19 @@ def main() -> None:
         sigma_k=SETTINGS.A2_SIGMA_K,
     )
 
+    # Snapshots are I/O bound: fetch them on a bounded pool reused across cycles.
+    # A shared token bucket keeps the average rate at 1/SNAPSHOT_SLEEP_S but lets a
+    # burst through without sleeping after every call.
+    bucket = TokenBucket(1.0 / SETTINGS.SNAPSHOT_SLEEP_S, SETTINGS.SNAPSHOT_BURST) if SETTINGS.SNAPSHOT_SLEEP_S > 0 else None
+
+    def fetch(meta):
+        # Respect rate limiting
+        if bucket is not None:
+            bucket.acquire()
+        return provider.fetch_snapshot(meta, depth_k=5, retries=3, prefer_liquid_token=True)
+
+    pool = ThreadPoolExecutor(max_workers=SETTINGS.SNAPSHOT_WORKERS)
+
     print("=== Research Engine starting ===")
     print("ALLOW_RESTRICTED =", SETTINGS.ALLOW_RESTRICTED)
     print("EXECUTION_ENABLED =", SETTINGS.EXECUTION_ENABLED)
@@ -96,20 +143,37 @@ def main() -> None:
         # Track markets for detailed output
         market_details: list[tuple[str, str, float, str, bool, bool, str]] = []  # slug, regime, botscore, resA, resH, routing
 
-        for meta in metas:
-            snap = provider.fetch_snapshot(meta, depth_k=5, retries=3, prefer_liquid_token=True)
-            # Respect rate limiting
-            if SETTINGS.SNAPSHOT_SLEEP_S > 0:
-                time.sleep(SETTINGS.SNAPSHOT_SLEEP_S)
+        # Rows are buffered per cycle and written in one transaction (one executemany per table)
+        snap_rows: List[SnapshotRow] = []
+        bs_rows: List[BotScoreRow] = []
+        sig_rows: List[SignalRow] = []
+        # Order intents are coalesced and submitted once per cycle
+        pending_intents: List[OrderIntent] = []
+
+        snaps = list(pool.map(fetch, metas))
+
+        # Screen the whole cycle column-wise (missing vol24h/depth5 as NaN)
+        vol24h = np.array([np.nan if s.vol24h is None else s.vol24h for s in snaps], dtype=float)
+        depth5 = np.array([np.nan if s.depth5 is None else s.depth5 for s in snaps], dtype=float)
+        ok_clob = np.array([s.ok_clob for s in snaps], dtype=bool)
+        frA = screener.screen_frame(family="A", vol24h=vol24h, depth5=depth5, ok_clob=ok_clob)
+        frH = screener.screen_frame(family="H", vol24h=vol24h, depth5=depth5, ok_clob=ok_clob)
+
+        # Per-market and summary lines are buffered and written once per cycle
+        out = io.StringIO()
+        emit = partial(print, file=out)
+
+        for i, (meta, snap) in enumerate(zip(metas, snaps)):
+            vol24h_f = float(snap.vol24h or 0.0)  # stored/scored volume (missing -> 0)
 
             # Persist snapshot (even if ok_clob is False; useful for diagnostics)
-            store.insert_snapshot(
+            snap_rows.append(
                 SnapshotRow(
                     ts=cycle_ts,
                     market_id=meta.market_id,
                     slug=meta.slug,
                     token_id=snap.token_id,
-                    vol24h=float(snap.vol24h or 0.0),
+                    vol24h=vol24h_f,
                     liquidity=float(snap.liquidity or 0.0),
                     mid=snap.mid,
                     spread=snap.spread,
@@ -125,10 +189,10 @@ def main() -> None:
 
             # Screening: use A thresholds for BOT-ish, H thresholds for HUMAN-ish later.
             # For now, screen both; we'll route after score.
-            resA = screener.screen(family="A", vol24h=snap.vol24h, depth5=snap.depth5, ok_clob=snap.ok_clob)
-            resH = screener.screen(family="H", vol24h=snap.vol24h, depth5=snap.depth5, ok_clob=snap.ok_clob)
+            ok_A = bool(frA.ok[i])
+            ok_H = bool(frH.ok[i])
 
-            if not (resA.ok or resH.ok):
+            if not (ok_A or ok_H):
                 skipped_screening += 1
                 continue
             ok_count += 1
@@ -143,27 +207,28 @@ def main() -> None:
                     mid_move_abs=mid_move,
                     spread=snap.spread,
                     depth5=snap.depth5,
-                    vol24h=float(snap.vol24h or 0.0),
+                    vol24h=vol24h_f,
                 )
             )
             regime = regime_from_score(bs)
-            store.insert_botscore(BotScoreRow(ts=cycle_ts, market_id=meta.market_id, token_id=snap.token_id, botscore=bs, regime=regime))
+            bs_rows.append(BotScoreRow(ts=cycle_ts, market_id=meta.market_id, token_id=snap.token_id, botscore=bs, regime=regime))
 
-            # Update rolling medians for A2
+            # Update rolling medians for A2 (one lookup per market)
+            roll = rolling[meta.market_id]
             if snap.spread is not None:
-                rolling[meta.market_id].spreads.append(float(snap.spread))
+                roll.spreads.append(float(snap.spread))
             if snap.depth5 is not None:
-                rolling[meta.market_id].depths.append(float(snap.depth5))
-            med_spread, med_depth = rolling[meta.market_id].medians()
+                roll.depths.append(float(snap.depth5))
+            med_spread, med_depth = roll.medians()
 
             # Router
             routing = ""
             if regime in ("BOT", "MIXED"):
                 # Prefer A screening
-                if not resA.ok:
+                if not ok_A:
                     skipped_regime += 1
-                    routing = f"BOT/MIXED but A screening failed (depth5={snap.depth5:.0f} need≥{resA.depth5_min:.0f}, vol24h={snap.vol24h:.0f} need≥{resA.vol24h_min:.0f})"
-                    market_details.append((meta.slug, regime, bs, resA.ok, resH.ok, routing))
+                    routing = f"BOT/MIXED but A screening failed (depth5={snap.depth5:.0f} need≥{frA.depth5_min:.0f}, vol24h={snap.vol24h:.0f} need≥{frA.vol24h_min:.0f})"
+                    market_details.append((meta.slug, regime, bs, ok_A, ok_H, routing))
                     continue
                 routing = f"→ A2 (BOT/MIXED regime)"
                 st = a2_state.get(meta.market_id, A2State())
@@ -187,7 +252,7 @@ def main() -> None:
                 if sig.fired:
                     a2_fires += 1
                     routing += f" [FIRED: {sig.details}]"
-                    store.insert_signal(SignalRow(
+                    sig_rows.append(SignalRow(
                         ts=cycle_ts,
                         market_id=meta.market_id,
                         token_id=snap.token_id,
@@ -196,30 +261,30 @@ def main() -> None:
                         strength=float(sig.strength),
                         details=sig.details
                     ))
-                    print(f"  [DB] ✅ Signal inserted: A2 FADE_CASCADE for {meta.slug[:50]} (strength={sig.strength:.3f}, {sig.details})")
+                    emit(f"  [DB] ✅ Signal inserted: A2 FADE_CASCADE for {meta.slug[:50]} (strength={sig.strength:.3f}, {sig.details})")
 
                     # Prepare an order intent (paper)
                     intent = OrderIntent(
                         token_id=snap.token_id,
                         side="SELL",   # placeholder: direction logic needs YES/NO semantics; keep as paper intent
                         price=float(snap.mid or 0.5),
-                        size=screener.S() * 0.25,  # tactical sizing
+                        size=S * 0.25,  # tactical sizing
                         reason="A2 cascade detected",
                         strategy="A2"
                     )
-                    execution.place_order(intent)  # no-op in research
+                    pending_intents.append(intent)
                 else:
                     routing += f" [no signal: {sig.details}] ({hist_status})"
             else:
                 # HUMAN regime → H1 candidate (manual checklist)
-                if not resH.ok:
+                if not ok_H:
                     skipped_regime += 1
                     routing = f"HUMAN but H screening failed"
-                    market_details.append((meta.slug, regime, bs, resA.ok, resH.ok, routing))
+                    market_details.append((meta.slug, regime, bs, ok_A, ok_H, routing))
                     continue
                 routing = f"→ H1 (HUMAN regime)"
                 h1_candidates += 1
-                store.insert_signal(SignalRow(
+                sig_rows.append(SignalRow(
                     ts=cycle_ts,
                     market_id=meta.market_id,
                     token_id=snap.token_id,
@@ -228,63 +293,69 @@ def main() -> None:
                     strength=0.5,
                     details="Human-regime candidate; run wording/resolution checklist manually."
                 ))
-                print(f"  [DB] Signal inserted: H1 CANDIDATE for {meta.slug[:50]}")
+                emit(f"  [DB] Signal inserted: H1 CANDIDATE for {meta.slug[:50]}")
             
-            market_details.append((meta.slug, regime, bs, resA.ok, resH.ok, routing))
+            market_details.append((meta.slug, regime, bs, ok_A, ok_H, routing))
             # Show detailed info for markets that pass screening
-            print(f"  [DB] Snapshot: {meta.slug[:50]:50s}")
-            print(f"       BotScore={bs:.3f} ({regime:6s}) | A={resA.ok} H={resH.ok} | depth5={snap.depth5:.0f} vol24h={snap.vol24h:.0f}")
-            print(f"       {routing}")
+            emit(f"  [DB] Snapshot: {meta.slug[:50]:50s}")
+            emit(f"       BotScore={bs:.3f} ({regime:6s}) | A={ok_A} H={ok_H} | depth5={snap.depth5:.0f} vol24h={snap.vol24h:.0f}")
+            emit(f"       {routing}")
+
+        store.insert_cycle(snapshots=snap_rows, botscores=bs_rows, signals=sig_rows)
+        if pending_intents:
+            execution.place_orders(pending_intents)  # no-op in research
 
         # Summary output
-        print(f"\n{'='*100}")
-        print(f"Cycle Summary:")
-        print(f"  Screenable markets: {ok_count}")
-        print(f"  A2 fires: {a2_fires}")
-        print(f"  H1 candidates: {h1_candidates}")
-        print(f"\n  Filtered out:")
-        print(f"    No CLOB access: {skipped_no_clob}")
-        print(f"    Failed screening (A & H): {skipped_screening}")
-        print(f"    Regime mismatch: {skipped_regime}")
+        emit(f"\n{'='*100}")
+        emit(f"Cycle Summary:")
+        emit(f"  Screenable markets: {ok_count}")
+        emit(f"  A2 fires: {a2_fires}")
+        emit(f"  H1 candidates: {h1_candidates}")
+        emit(f"\n  Filtered out:")
+        emit(f"    No CLOB access: {skipped_no_clob}")
+        emit(f"    Failed screening (A & H): {skipped_screening}")
+        emit(f"    Regime mismatch: {skipped_regime}")
         
         # Show markets grouped by regime
         if market_details:
             bot_markets = [m for m in market_details if m[1] in ("BOT", "MIXED")]
             human_markets = [m for m in market_details if m[1] == "HUMAN"]
             
-            print(f"\n  Markets by Regime (for strategy routing):")
-            print(f"    BOT/MIXED markets ({len(bot_markets)}): → A2 strategy (microstructure-based)")
-            for slug, regime, bs, okA, okH, routing in sorted(bot_markets, key=lambda x: x[2], reverse=True)[:5]:
+            emit(f"\n  Markets by Regime (for strategy routing):")
+            emit(f"    BOT/MIXED markets ({len(bot_markets)}): → A2 strategy (microstructure-based)")
+            for slug, regime, bs, okA, okH, routing in heapq.nlargest(5, bot_markets, key=itemgetter(2)):
                 tags = []
                 if okA:
                     tags.append("A")
                 if okH:
                     tags.append("H")
                 tag_str = f"[{'+'.join(tags)}]" if tags else "[--]"
-                print(f"      {tag_str:6s} {slug[:45]:45s} BotScore={bs:.3f} ({regime:6s})")
+                emit(f"      {tag_str:6s} {slug[:45]:45s} BotScore={bs:.3f} ({regime:6s})")
             
-            print(f"\n    HUMAN markets ({len(human_markets)}): → H1 strategy (information-based)")
-            for slug, regime, bs, okA, okH, routing in sorted(human_markets, key=lambda x: x[2], reverse=False)[:5]:
+            emit(f"\n    HUMAN markets ({len(human_markets)}): → H1 strategy (information-based)")
+            for slug, regime, bs, okA, okH, routing in heapq.nsmallest(5, human_markets, key=itemgetter(2)):
                 tags = []
                 if okA:
                     tags.append("A")
                 if okH:
                     tags.append("H")
                 tag_str = f"[{'+'.join(tags)}]" if tags else "[--]"
-                print(f"      {tag_str:6s} {slug[:45]:45s} BotScore={bs:.3f} ({regime:6s})")
+                emit(f"      {tag_str:6s} {slug[:45]:45s} BotScore={bs:.3f} ({regime:6s})")
             
             if len(bot_markets) > 5 or len(human_markets) > 5:
-                print(f"    ... (showing top 5 of each regime)")
+                emit(f"    ... (showing top 5 of each regime)")
             
             # Explain why A2/H1 aren't firing
             if a2_fires == 0 and len(bot_markets) > 0:
-                print(f"\n  ⚠️  A2 not firing: Requires cascade conditions (spread expansion + depth collapse + mid jump)")
-                print(f"     Need at least 2/3 conditions. Historical medians are being built up over cycles.")
+                emit(f"\n  ⚠️  A2 not firing: Requires cascade conditions (spread expansion + depth collapse + mid jump)")
+                emit(f"     Need at least 2/3 conditions. Historical medians are being built up over cycles.")
             if h1_candidates == 0 and len(human_markets) == 0:
-                print(f"\n  ⚠️  H1 candidates: 0 (all markets classified as BOT/MIXED)")
-                print(f"     BotScore calculation may need tuning. Current threshold: BOT≥0.65, HUMAN≤0.40")
+                emit(f"\n  ⚠️  H1 candidates: 0 (all markets classified as BOT/MIXED)")
+                emit(f"     BotScore calculation may need tuning. Current threshold: BOT≥0.65, HUMAN≤0.40")
         
-        print(f"{'='*100}")
+        emit(f"{'='*100}")
+        sys.stdout.write(out.getvalue())
+        sys.stdout.flush()
         time.sleep(SETTINGS.LOOP_SLEEP_S)
 
 
@@ -1,8 +1,11 @@
 from __future__ import annotations
 
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import numpy as np
+
 # Add src to path for imports
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
@@ -75,28 +78,36 @@ def main() -> None:
 
     # 2) Screen markets and collect results
     results: list[tuple[str, float, float, float, float, bool, bool]] = []  # slug, depth5, vol24h, exit_A, exit_H, ok_A, ok_H
-    ok_A, ok_H = 0, 0
-
-    for meta in metas[:200]:
-        snap = provider.fetch_snapshot(meta, depth_k=5, retries=3, prefer_liquid_token=True)
-
-        resA = screener.screen(family="A", vol24h=snap.vol24h, depth5=snap.depth5, ok_clob=snap.ok_clob)
-        resH = screener.screen(family="H", vol24h=snap.vol24h, depth5=snap.depth5, ok_clob=snap.ok_clob)
-
-        if resA.ok or resH.ok:
-            results.append((
-                snap.slug,
-                snap.depth5 or 0.0,
-                snap.vol24h or 0.0,
-                resA.exit_risk or 0.0,
-                resH.exit_risk or 0.0,
-                resA.ok,
-                resH.ok,
-            ))
-            if resA.ok:
-                ok_A += 1
-            if resH.ok:
-                ok_H += 1
+
+    # Snapshots are I/O bound: fetch them on a bounded pool, consume in universe order
+    def fetch(meta):
+        return provider.fetch_snapshot(meta, depth_k=5, retries=3, prefer_liquid_token=True)
+
+    with ThreadPoolExecutor(max_workers=SETTINGS.SNAPSHOT_WORKERS) as pool:
+        snaps = list(pool.map(fetch, metas[:200]))
+
+    # Screen the whole universe column-wise (missing values as NaN)
+    vol24h = np.array([np.nan if s.vol24h is None else s.vol24h for s in snaps], dtype=float)
+    depth5 = np.array([np.nan if s.depth5 is None else s.depth5 for s in snaps], dtype=float)
+    ok_clob = np.array([s.ok_clob for s in snaps], dtype=bool)
+    resA = screener.screen_frame(family="A", vol24h=vol24h, depth5=depth5, ok_clob=ok_clob)
+    resH = screener.screen_frame(family="H", vol24h=vol24h, depth5=depth5, ok_clob=ok_clob)
+    exit_A = np.nan_to_num(resA.exit_risk)
+    exit_H = np.nan_to_num(resH.exit_risk)
+
+    for i in np.flatnonzero(resA.ok | resH.ok):
+        snap = snaps[i]
+        results.append((
+            snap.slug,
+            snap.depth5 or 0.0,
+            snap.vol24h or 0.0,
+            float(exit_A[i]),
+            float(exit_H[i]),
+            bool(resA.ok[i]),
+            bool(resH.ok[i]),
+        ))
+    ok_A = int(resA.ok.sum())
+    ok_H = int(resH.ok.sum())
 
     # 3) Display results with pagination
     page_size = 10
@@ -2,7 +2,7 @@
 from __future__ import annotations
 from dataclasses import dataclass
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class Settings:
 
     # --- Mode toggles ---
@@ -17,9 +17,11 @@ class Settings:
     LIMIT: int = 100
     ORDER: str = "volume24hr"
     ASCENDING: bool = False
-    SNAPSHOT_SLEEP_S: float = 0.05       # sleep between CLOB calls
+    SNAPSHOT_SLEEP_S: float = 0.05       # mean spacing between snapshot fetches (rate = 1/SLEEP; 0 = unlimited)
+    SNAPSHOT_BURST: int = 16             # snapshot fetches allowed back-to-back before pacing kicks in
     LOOP_SLEEP_S: float = 30.0           # seconds between full cycles
     MAX_MARKETS_PER_CYCLE: int = 80      # hard cap to control rate/latency
+    SNAPSHOT_WORKERS: int = 16           # concurrent market snapshot fetches
 
     # --- Capital assumptions (screening) ---
     EQUITY: float = 10_000.0
@@ -1,18 +1,29 @@
 """Domain logic: screening, bot score, microstructure."""
 
-from .screening import ScreeningConfig, ScreeningEngine, ScreeningResult
-from .bot_score import BotScoreInputs, botscore_v0, regime_from_score, BotScoreV0
-from .microstructure import depth5_notional, best_bid_ask, book_symmetry
+from .screening import ScreeningConfig, ScreeningEngine, ScreeningResult, ScreeningFrameResult, ScreenReason
+from .bot_score import BotScoreInputs, botscore_v0, botscore_v0_batch, regime_from_score, regime_from_score_batch, REGIMES, BotScoreV0, RefDistribution, RingBuffer
+from .microstructure import depth5_notional, best_bid_ask, book_symmetry, book_symmetry_batch, top_levels_notional_batch, book_snapshot, MicroSnapshot
 
 __all__ = [
     "ScreeningConfig",
     "ScreeningEngine",
     "ScreeningResult",
+    "ScreeningFrameResult",
+    "ScreenReason",
     "BotScoreInputs",
     "botscore_v0",
+    "botscore_v0_batch",
     "regime_from_score",
+    "regime_from_score_batch",
+    "REGIMES",
     "BotScoreV0",
+    "RefDistribution",
+    "RingBuffer",
     "depth5_notional",
     "best_bid_ask",
     "book_symmetry",
+    "book_symmetry_batch",
+    "top_levels_notional_batch",
+    "book_snapshot",
+    "MicroSnapshot",
 ]
@@ -1,11 +1,19 @@
 from __future__ import annotations
 
+from concurrent.futures import Executor
 from dataclasses import dataclass
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Optional, Sequence, Union
+import math
+
 import numpy as np
 
+# Normalizers for the log-scaled botscore components (hoisted out of the per-call path)
+_LOG_10001 = math.log(10001)
+_LOG_11 = math.log(11)
+
 
-@dataclass
+@dataclass(slots=True)
 class BotFeatures:
     ci_proxy: float   # quote churn proxy
     qtr_proxy: float  # book_changes / trades
@@ -13,7 +21,35 @@ class BotFeatures:
     symmetry: float   # book symmetry (0..1)
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
+class BotFeaturesBatch:
+    """BotFeatures for a batch of markets as one float64 column per feature."""
+    ci_proxy: np.ndarray
+    qtr_proxy: np.ndarray
+    pmwv: np.ndarray
+    symmetry: np.ndarray
+
+    @classmethod
+    def from_features(cls, feats: Sequence[BotFeatures]) -> "BotFeaturesBatch":
+        n = len(feats)
+        return cls(
+            np.fromiter((f.ci_proxy for f in feats), dtype=np.float64, count=n),
+            np.fromiter((f.qtr_proxy for f in feats), dtype=np.float64, count=n),
+            np.fromiter((f.pmwv for f in feats), dtype=np.float64, count=n),
+            np.fromiter((f.symmetry for f in feats), dtype=np.float64, count=n),
+        )
+
+    def columns(self) -> tuple:
+        return (self.ci_proxy, self.qtr_proxy, self.pmwv, self.symmetry)
+
+    def __len__(self) -> int:
+        return self.ci_proxy.size
+
+    def __getitem__(self, sl: slice) -> "BotFeaturesBatch":
+        return BotFeaturesBatch(self.ci_proxy[sl], self.qtr_proxy[sl], self.pmwv[sl], self.symmetry[sl])
+
+
+@dataclass(frozen=True, slots=True)
 class BotScoreInputs:
     mid_move_abs: float
     spread: Optional[float]
@@ -21,14 +57,106 @@ class BotScoreInputs:
     vol24h: float
 
 
-def percentile_rank(x: float, ref: List[float]) -> float:
+class RingBuffer:
+    """
+    Fixed-capacity float64 FIFO backed by a preallocated array.
+    push() is O(1) and overwrites the oldest value once full.
+    """
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._buf = np.empty(capacity, dtype=np.float64)
+        self._head = 0  # next write position
+        self._n = 0
+
+    def __len__(self) -> int:
+        return self._n
+
+    @property
+    def capacity(self) -> int:
+        return self._buf.size
+
+    def push(self, x: float) -> Optional[float]:
+        """Append x; returns the evicted value when the buffer was full."""
+        evicted = float(self._buf[self._head]) if self._n == self._buf.size else None
+        self._buf[self._head] = x
+        self._head = (self._head + 1) % self._buf.size
+        self._n = min(self._n + 1, self._buf.size)
+        return evicted
+
+    def view(self) -> np.ndarray:
+        """Values oldest -> newest (a view until the buffer wraps, then a copy)."""
+        if self._n < self._buf.size:
+            return self._buf[:self._n]
+        return np.concatenate([self._buf[self._head:], self._buf[:self._head]])
+
+
+class RefDistribution:
+    """
+    Reference distribution kept as a sorted float64 array, so a percentile
+    rank is a binary search instead of a scan over the history.
+    With a capacity, only the most recent `capacity` values are kept.
+    """
+    def __init__(self, values: Sequence[float] = (), capacity: Optional[int] = None):
+        self._ring = RingBuffer(capacity) if capacity is not None else None
+        if self._ring is not None:
+            for x in np.asarray(values, dtype=np.float64)[-capacity:]:
+                self._ring.push(x)
+            self._sorted = np.sort(self._ring.view())
+        else:
+            self._sorted = np.sort(np.asarray(values, dtype=np.float64))
+
+    def __len__(self) -> int:
+        return self._sorted.size
+
+    @property
+    def sorted(self) -> np.ndarray:
+        return self._sorted
+
+    def add(self, x: float) -> None:
+        if self._ring is not None:
+            evicted = self._ring.push(x)
+            if evicted is not None:
+                self._sorted = np.delete(self._sorted, np.searchsorted(self._sorted, evicted))
+        i = np.searchsorted(self._sorted, x)
+        self._sorted = np.insert(self._sorted, i, x)
+
+    def extend(self, xs: Sequence[float]) -> None:
+        """Batched update: one concatenate + sort instead of len(xs) inserts."""
+        xs = np.asarray(xs, dtype=np.float64)
+        if self._ring is not None:
+            for x in xs:
+                self._ring.push(x)
+            self._sorted = np.sort(self._ring.view())
+        else:
+            self._sorted = np.sort(np.concatenate([self._sorted, xs]))
+
+    def rank(self, x: Union[float, np.ndarray]) -> Union[float, np.ndarray]:
+        """Fraction of reference values strictly below x, in [0,1] (0.5 if empty)."""
+        n = self._sorted.size
+        if n == 0:
+            return 0.5 if np.ndim(x) == 0 else np.full(np.shape(x), 0.5)
+        r = np.searchsorted(self._sorted, x, side="left") / n
+        return float(r) if np.ndim(x) == 0 else r
+
+
+def percentile_rank(
+    x: Union[float, np.ndarray],
+    ref: Union[Sequence[float], RefDistribution],
+) -> Union[float, np.ndarray]:
     """
     Returns percentile rank in [0,1].
+    x may be a scalar or an array of values ranked against the same reference.
     """
-    if not ref:
-        return 0.5
+    if isinstance(ref, RefDistribution):
+        return ref.rank(x)
+    if len(ref) == 0:
+        return 0.5 if np.ndim(x) == 0 else np.full(np.shape(x), 0.5)
     arr = np.asarray(ref, dtype=float)
-    return float((arr < x).mean())
+    if np.ndim(x) == 0:
+        return float((arr < x).mean())
+    # One sort amortized over the batch: rank = #(ref < x) / n
+    return np.searchsorted(np.sort(arr), x, side="left") / arr.size
 
 
 class BotScoreV0:
@@ -37,14 +165,29 @@ class BotScoreV0:
         self.w_qtr = w_qtr
         self.w_pmwv = w_pmwv
         self.w_sym = w_sym
+        self._weights = np.array([w_ci, w_qtr, w_pmwv, w_sym], dtype=float)
+        self._refs_sorted: Optional[List[np.ndarray]] = None
+
+    def set_refs(
+        self,
+        ref_ci: Union[Sequence[float], RefDistribution],
+        ref_qtr: Union[Sequence[float], RefDistribution],
+        ref_pmwv: Union[Sequence[float], RefDistribution],
+        ref_sym: Union[Sequence[float], RefDistribution],
+    ) -> None:
+        """Cache sorted reference distributions for score_batch()."""
+        self._refs_sorted = [
+            r.sorted if isinstance(r, RefDistribution) else np.sort(np.asarray(r, dtype=float))
+            for r in (ref_ci, ref_qtr, ref_pmwv, ref_sym)
+        ]
 
     def score(
         self,
         feat: BotFeatures,
-        ref_ci: List[float],
-        ref_qtr: List[float],
-        ref_pmwv: List[float],
-        ref_sym: List[float],
+        ref_ci: Union[List[float], RefDistribution],
+        ref_qtr: Union[List[float], RefDistribution],
+        ref_pmwv: Union[List[float], RefDistribution],
+        ref_sym: Union[List[float], RefDistribution],
     ) -> float:
         # Normalize to percentiles
         ci = percentile_rank(feat.ci_proxy, ref_ci)
@@ -53,6 +196,44 @@ class BotScoreV0:
         sym = percentile_rank(feat.symmetry, ref_sym)
         return self.w_ci * ci + self.w_qtr * qtr + self.w_pmwv * pmwv + self.w_sym * sym
 
+    def score_batch(self, feats: Union[np.ndarray, BotFeaturesBatch]) -> np.ndarray:
+        """
+        Score many markets at once against the refs cached by set_refs().
+        feats: a BotFeaturesBatch, or a (B, 4) array of
+        [ci_proxy, qtr_proxy, pmwv, symmetry] per row.
+        Returns (B,) scores, identical to score() row by row.
+        """
+        if self._refs_sorted is None:
+            raise ValueError("set_refs() must be called before score_batch()")
+        if isinstance(feats, BotFeaturesBatch):
+            cols = feats.columns()
+        else:
+            cols = np.asarray(feats, dtype=float).T
+        ranks = np.empty((len(cols[0]), 4), dtype=float)
+        for j, (ref, col) in enumerate(zip(self._refs_sorted, cols)):
+            if ref.size == 0:
+                ranks[:, j] = 0.5
+            else:
+                ranks[:, j] = np.searchsorted(ref, col, side="left") / ref.size
+        return ranks @ self._weights
+
+    def score_batch_parallel(
+        self,
+        feats: Union[np.ndarray, BotFeaturesBatch],
+        executor: Executor,
+        chunks: int,
+    ) -> np.ndarray:
+        """
+        score_batch() over `chunks` contiguous slices submitted to `executor`.
+        searchsorted and the matmul release the GIL, so with a thread pool the
+        slices run concurrently; results are identical to score_batch().
+        """
+        if not isinstance(feats, BotFeaturesBatch):
+            feats = np.asarray(feats, dtype=float)
+        bounds = np.linspace(0, len(feats), max(1, chunks) + 1).astype(int)
+        parts = [feats[lo:hi] for lo, hi in zip(bounds[:-1], bounds[1:])]
+        return np.concatenate(list(executor.map(self.score_batch, parts)))
+
     @staticmethod
     def bucket(bot_score: float) -> str:
         if bot_score >= 0.65:
@@ -63,6 +244,9 @@ class BotScoreV0:
 
 
 # Simplified interface functions for engine_research.py
+# BotScoreInputs is frozen (hashable) and the score is pure, so slow-moving
+# markets that repeat the same inputs cycle after cycle hit the cache.
+@lru_cache(maxsize=4096)
 def botscore_v0(inputs: BotScoreInputs) -> float:
     """
     Improved botscore calculation from snapshot inputs.
@@ -93,7 +277,7 @@ def botscore_v0(inputs: BotScoreInputs) -> float:
     pmwv = inputs.mid_move_abs / max(inputs.vol24h, 1e-9)
     # Typical range: 0.000001 to 0.1
     # Use sigmoid-like transformation: log(1 + pmwv * 10000) / log(10001)
-    pmwv_score = min(1.0, np.log1p(pmwv * 10000) / np.log(10001))
+    pmwv_score = min(1.0, math.log1p(pmwv * 10000) / _LOG_10001)
     
     # 2) Spread tightness component
     # Lower spread = more bot-like (market makers keep spreads tight)
@@ -114,7 +298,7 @@ def botscore_v0(inputs: BotScoreInputs) -> float:
         depth_vol_ratio = inputs.depth5 / max(inputs.vol24h, 1e-9)
         # Typical range: 0.01 to 10+
         # Use log scale: log(1 + ratio) / log(11)
-        depth_score = min(1.0, np.log1p(depth_vol_ratio) / np.log(11))
+        depth_score = min(1.0, math.log1p(depth_vol_ratio) / _LOG_11)
     
     # 4) Spread stability proxy (using current spread as indicator)
     # Very tight spreads (< 0.002) suggest active market making (bot-like)
@@ -141,9 +325,68 @@ def botscore_v0(inputs: BotScoreInputs) -> float:
     )
     
     # Ensure score is in [0, 1]
-    return float(np.clip(score, 0.0, 1.0))
+    return 0.0 if score < 0.0 else 1.0 if score > 1.0 else score
+
+
+def botscore_v0_batch(
+    mid_move_abs: np.ndarray,
+    spread: np.ndarray,
+    depth5: np.ndarray,
+    vol24h: np.ndarray,
+) -> np.ndarray:
+    """
+    botscore_v0 over 1-D arrays of per-market inputs (missing spread/depth5 as NaN).
+    Same components and weights, evaluated as whole-array NumPy expressions.
+    """
+    mid_move_abs = np.asarray(mid_move_abs, dtype=np.float64)
+    spread = np.asarray(spread, dtype=np.float64)
+    depth5 = np.asarray(depth5, dtype=np.float64)
+    vol24h = np.asarray(vol24h, dtype=np.float64)
+    vol = np.maximum(vol24h, 1e-9)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        pmwv_score = np.minimum(1.0, np.log1p(mid_move_abs / vol * 10000) / _LOG_10001)
+
+        has_spread = ~np.isnan(spread)
+        spread_score = np.where(has_spread & (spread > 0), 1.0 / (1.0 + spread * 100), 0.5)
+
+        has_depth = ~np.isnan(depth5) & (depth5 > 0)
+        depth_score = np.where(has_depth, np.minimum(1.0, np.log1p(depth5 / vol) / _LOG_11), 0.3)
+
+    stability_score = np.select(
+        [~has_spread, spread < 0.002, spread < 0.01, spread < 0.05],
+        [0.5, 1.0, 0.7, 0.4],
+        default=0.2,
+    )
+
+    score = (
+        0.30 * pmwv_score +
+        0.25 * spread_score +
+        0.25 * depth_score +
+        0.20 * stability_score
+    )
+    return np.where(vol24h > 0, np.clip(score, 0.0, 1.0), 0.5)
 
 
 def regime_from_score(bot_score: float) -> str:
     """Convert botscore to regime classification."""
     return BotScoreV0.bucket(bot_score)
+
+
+# Regime labels indexed by regime_from_score_batch() codes
+REGIMES = ("HUMAN", "MIXED", "BOT")
+
+# HUMAN is <= 0.40 (inclusive) while BOT is >= 0.65, so the lower bin edge sits
+# one ulp above 0.40 for np.digitize's left-closed bins.
+_REGIME_EDGES = np.array([np.nextafter(0.40, 1.0), 0.65])
+
+
+def regime_from_score_batch(scores: np.ndarray) -> np.ndarray:
+    """
+    regime_from_score over an array of botscores, as int8 codes into REGIMES
+    (0=HUMAN, 1=MIXED, 2=BOT). NaN maps to MIXED, as in regime_from_score.
+    """
+    scores = np.asarray(scores, dtype=np.float64)
+    codes = np.digitize(scores, _REGIME_EDGES)
+    # digitize puts NaN past the last edge (BOT); bucket() fails both compares -> MIXED
+    return np.where(np.isnan(scores), 1, codes).astype(np.int8)
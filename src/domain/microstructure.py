@@ -1,8 +1,11 @@
 from __future__ import annotations
 
+from dataclasses import dataclass
 from typing import Any, Dict, List, Tuple
 import math
 
+import numpy as np
+
 
 def _sum_top_levels(levels: List[Dict[str, str]], k: int = 5) -> float:
     """
@@ -10,11 +13,10 @@ def _sum_top_levels(levels: List[Dict[str, str]], k: int = 5) -> float:
     We interpret 'size' as base quantity; for a quick Depth proxy we use notional ~ price*size.
     If you want USDC depth precisely, refine once we confirm size semantics for each token.
     """
+    # Plain loop: for <= k levels it beats building arrays (see top_levels_notional_batch for stacks)
     s = 0.0
     for lvl in levels[:k]:
-        px = float(lvl["price"])
-        sz = float(lvl["size"])
-        s += px * sz
+        s += float(lvl["price"]) * float(lvl["size"])
     return s
 
 
@@ -39,3 +41,52 @@ def book_symmetry(depth_bid: float, depth_ask: float, eps: float = 1e-9) -> floa
     1 = perfectly symmetric, 0 = totally one-sided
     """
     return 1.0 - abs(depth_bid - depth_ask) / (depth_bid + depth_ask + eps)
+
+
+def book_symmetry_batch(depth_bid: np.ndarray, depth_ask: np.ndarray, eps: float = 1e-9) -> np.ndarray:
+    """
+    book_symmetry over arrays of per-market bid/ask depths.
+    """
+    bid = np.asarray(depth_bid, dtype=np.float64)
+    ask = np.asarray(depth_ask, dtype=np.float64)
+    return 1.0 - np.abs(bid - ask) / (bid + ask + eps)
+
+
+def top_levels_notional_batch(levels: np.ndarray) -> np.ndarray:
+    """
+    levels: (M, k, 2) array of [price, size] for the top k levels of M books
+    (pad missing levels with zeros). Returns the (M,) notional sums.
+    """
+    levels = np.asarray(levels, dtype=np.float64)
+    return (levels[..., 0] * levels[..., 1]).sum(axis=1)
+
+
+@dataclass(slots=True)
+class MicroSnapshot:
+    bb: float        # best bid (nan if no bids)
+    ba: float        # best ask (nan if no asks)
+    mid: float
+    spread: float
+    bid5: float      # top-k bid notional
+    ask5: float      # top-k ask notional
+    depth5: float    # bid5 + ask5
+    symmetry: float
+
+
+def book_snapshot(order_book: Dict[str, Any], k: int = 5, eps: float = 1e-9) -> MicroSnapshot:
+    """
+    One pass over the book: a single loop per side accumulates the top-k
+    notional, and top of book is read from level [0].
+    Equivalent to depth5_notional + best_bid_ask + book_symmetry.
+    """
+    bids = order_book.get("bids", [])
+    asks = order_book.get("asks", [])
+    bb = float(bids[0]["price"]) if bids else math.nan
+    ba = float(asks[0]["price"]) if asks else math.nan
+    bid5 = 0.0
+    for lvl in bids[:k]:
+        bid5 += float(lvl["price"]) * float(lvl["size"])
+    ask5 = 0.0
+    for lvl in asks[:k]:
+        ask5 += float(lvl["price"]) * float(lvl["size"])
+    return MicroSnapshot(bb, ba, 0.5 * (bb + ba), ba - bb, bid5, ask5, bid5 + ask5, book_symmetry(bid5, ask5, eps))
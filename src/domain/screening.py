@@ -1,12 +1,28 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
+from enum import IntEnum
 from typing import Literal, Optional
 
+import numpy as np
+
 StrategyFamily = Literal["A", "H"]
 
 
-@dataclass(frozen=True)
+class ScreenReason(IntEnum):
+    """Screening outcome; also the int8 code stored by screen_frame()."""
+    OK = 0
+    NO_CLOB_BOOK = 1
+    DEPTH_TOO_LOW = 2
+    VOL24H_MISSING = 3
+    VOL24H_TOO_LOW = 4
+    EXIT_RISK_TOO_HIGH = 5
+
+    def __str__(self) -> str:
+        return self.name
+
+
+@dataclass(frozen=True, slots=True)
 class ScreeningConfig:
     equity: float
     target_pos_frac: float = 0.01
@@ -18,10 +34,10 @@ class ScreeningConfig:
     exit_risk_max_H: float = 0.20
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ScreeningResult:
     ok: bool
-    reason: str
+    reason: ScreenReason
     family: StrategyFamily
     S: float
     exit_risk: Optional[float]
@@ -29,12 +45,29 @@ class ScreeningResult:
     vol24h_min: float
 
 
+@dataclass(frozen=True, slots=True)
+class ScreeningFrameResult:
+    """Column-wise ScreeningResult for a batch of markets."""
+    ok: np.ndarray          # bool per market
+    reason: np.ndarray      # int8 ScreenReason code per market
+    family: StrategyFamily
+    S: float
+    exit_risk: np.ndarray   # NaN where screening stopped before the exit-risk gate
+    depth5_min: float
+    vol24h_min: float
+
+
 class ScreeningEngine:
     def __init__(self, cfg: ScreeningConfig):
         self.cfg = cfg
+        # Config is frozen, so position size and per-family thresholds are fixed
+        self._S = cfg.equity * cfg.target_pos_frac
+        # (depth5_min, vol24h_min, exit_risk_max)
+        self._thresholds_A = (cfg.depth5_min_mult_A * self._S, cfg.vol24h_min_mult_A * self._S, cfg.exit_risk_max_A)
+        self._thresholds_H = (cfg.depth5_min_mult_H * self._S, cfg.vol24h_min_mult_H * self._S, cfg.exit_risk_max_H)
 
     def S(self) -> float:
-        return self.cfg.equity * self.cfg.target_pos_frac
+        return self._S
 
     def screen(
         self,
@@ -44,31 +77,68 @@ class ScreeningEngine:
         depth5: Optional[float],
         ok_clob: bool,
     ) -> ScreeningResult:
-        S = self.S()
-
-        if family == "A":
-            depth5_min = self.cfg.depth5_min_mult_A * S
-            vol24h_min = self.cfg.vol24h_min_mult_A * S
-            exit_risk_max = self.cfg.exit_risk_max_A
-        else:
-            depth5_min = self.cfg.depth5_min_mult_H * S
-            vol24h_min = self.cfg.vol24h_min_mult_H * S
-            exit_risk_max = self.cfg.exit_risk_max_H
+        S = self._S
+        depth5_min, vol24h_min, exit_risk_max = self._thresholds_A if family == "A" else self._thresholds_H
 
         if not ok_clob or depth5 is None:
-            return ScreeningResult(False, "NO_CLOB_BOOK", family, S, None, depth5_min, vol24h_min)
+            return ScreeningResult(False, ScreenReason.NO_CLOB_BOOK, family, S, None, depth5_min, vol24h_min)
 
         if depth5 < depth5_min:
-            return ScreeningResult(False, "DEPTH_TOO_LOW", family, S, None, depth5_min, vol24h_min)
+            return ScreeningResult(False, ScreenReason.DEPTH_TOO_LOW, family, S, None, depth5_min, vol24h_min)
 
         if vol24h is None:
-            return ScreeningResult(False, "VOL24H_MISSING", family, S, None, depth5_min, vol24h_min)
+            return ScreeningResult(False, ScreenReason.VOL24H_MISSING, family, S, None, depth5_min, vol24h_min)
 
         if vol24h < vol24h_min:
-            return ScreeningResult(False, "VOL24H_TOO_LOW", family, S, None, depth5_min, vol24h_min)
+            return ScreeningResult(False, ScreenReason.VOL24H_TOO_LOW, family, S, None, depth5_min, vol24h_min)
 
         exit_risk = S / max(vol24h, 1e-9)
         if exit_risk > exit_risk_max:
-            return ScreeningResult(False, "EXIT_RISK_TOO_HIGH", family, S, exit_risk, depth5_min, vol24h_min)
+            return ScreeningResult(False, ScreenReason.EXIT_RISK_TOO_HIGH, family, S, exit_risk, depth5_min, vol24h_min)
+
+        return ScreeningResult(True, ScreenReason.OK, family, S, exit_risk, depth5_min, vol24h_min)
 
-        return ScreeningResult(True, "OK", family, S, exit_risk, depth5_min, vol24h_min)
+    def screen_frame(
+        self,
+        *,
+        family: StrategyFamily,
+        vol24h: np.ndarray,
+        depth5: np.ndarray,
+        ok_clob: np.ndarray,
+    ) -> ScreeningFrameResult:
+        """
+        Vectorized screen() over column arrays (missing vol24h/depth5 as NaN).
+        ok[i] and ScreenReason(reason[i]) match screen() on row i.
+        """
+        S = self._S
+        depth5_min, vol24h_min, exit_risk_max = self._thresholds_A if family == "A" else self._thresholds_H
+
+        vol24h = np.asarray(vol24h, dtype=np.float64)
+        depth5 = np.asarray(depth5, dtype=np.float64)
+        ok_clob = np.asarray(ok_clob, dtype=bool)
+
+        # NaN compares False, so missing values fail their gate
+        reaches_exit = ok_clob & (depth5 >= depth5_min) & (vol24h >= vol24h_min)
+        exit_risk = np.where(reaches_exit, S / np.maximum(vol24h, 1e-9), np.nan)
+        ok = reaches_exit & (exit_risk <= exit_risk_max)
+
+        # First failing gate wins, in screen()'s order
+        reason = np.select(
+            [
+                ~ok_clob | np.isnan(depth5),
+                depth5 < depth5_min,
+                np.isnan(vol24h),
+                vol24h < vol24h_min,
+                ~ok,
+            ],
+            [
+                ScreenReason.NO_CLOB_BOOK,
+                ScreenReason.DEPTH_TOO_LOW,
+                ScreenReason.VOL24H_MISSING,
+                ScreenReason.VOL24H_TOO_LOW,
+                ScreenReason.EXIT_RISK_TOO_HIGH,
+            ],
+            default=ScreenReason.OK,
+        ).astype(np.int8)
+
+        return ScreeningFrameResult(ok, reason, family, S, exit_risk, depth5_min, vol24h_min)
@@ -1,8 +1,8 @@
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional, Sequence
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class OrderIntent:
     token_id: str
     side: str      # "BUY" or "SELL"
@@ -26,3 +26,13 @@ class ExecutionAdapter:
             # research mode: no-op
             return None
         raise NotImplementedError("Execution is disabled or not implemented. Keep EXECUTION_ENABLED=False in research mode.")
+
+    def place_orders(self, intents: Sequence[OrderIntent]) -> List[Optional[str]]:
+        """
+        Submit a batch of intents (e.g. all fires of one cycle) in one call.
+        Returns one order id (or None) per intent, in order.
+        """
+        if not self.enabled:
+            # research mode: no-op
+            return [None] * len(intents)
+        raise NotImplementedError("Execution is disabled or not implemented. Keep EXECUTION_ENABLED=False in research mode.")
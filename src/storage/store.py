@@ -1,10 +1,16 @@
 from __future__ import annotations
 import sqlite3
+import threading
 import time
-from dataclasses import dataclass
-from typing import Optional
+from contextlib import contextmanager
+from dataclasses import dataclass, fields
+from itertools import chain
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
 
-@dataclass(frozen=True)
+from ..domain.bot_score import REGIMES
+
+@dataclass(frozen=True, slots=True)
 class SnapshotRow:
     ts: int
     market_id: str
@@ -18,7 +24,7 @@ class SnapshotRow:
     ok_clob: int
     restricted: int
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class BotScoreRow:
     ts: int
     market_id: str
@@ -26,7 +32,7 @@ class BotScoreRow:
     botscore: float
     regime: str
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class SignalRow:
     ts: int
     market_id: str
@@ -36,13 +42,90 @@ class SignalRow:
     strength: float
     details: str
 
+# SQLite's historical default SQLITE_MAX_VARIABLE_NUMBER
+_MAX_PARAMS = 999
+
+@dataclass(frozen=True, slots=True)
+class _InsertPlan:
+    sql: str                            # single-row INSERT
+    params: Callable[[Any], Tuple]      # row -> params tuple
+    batch_sql: str                      # multi-row INSERT of batch_rows rows
+    batch_rows: int
+
+def _insert_plan(
+    table: str,
+    row_cls: type,
+    params: Optional[Callable[[Any], Tuple]] = None,
+) -> _InsertPlan:
+    """
+    Build the INSERT statements and a row -> params getter from the row dataclass,
+    once at import, so bulk inserts reuse the same statement texts and skip per-row tuple code.
+    params overrides the plain field getter when columns are encoded on the way in.
+    """
+    cols = [f.name for f in fields(row_cls)]
+    head = f"INSERT INTO {table} ({','.join(cols)}) VALUES "
+    row = f"({','.join('?' * len(cols))})"
+    batch_rows = _MAX_PARAMS // len(cols)
+    getter = params if params is not None else attrgetter(*cols)
+    return _InsertPlan(head + row, getter, head + ",".join([row] * batch_rows), batch_rows)
+
+def _insert_many(con: sqlite3.Connection, plan: _InsertPlan, rows: Sequence[Any]) -> None:
+    """
+    Insert rows as full multi-row VALUES statements (one VDBE run per batch_rows
+    rows), with the leftover tail going through executemany on the single-row one.
+    """
+    params = list(map(plan.params, rows))
+    k = plan.batch_rows
+    full = len(params) - len(params) % k
+    for start in range(0, full, k):
+        con.execute(plan.batch_sql, list(chain.from_iterable(params[start:start + k])))
+    if full < len(params):
+        con.executemany(plan.sql, params[full:])
+
+# bot_scores.regime is stored as its index in REGIMES (0=HUMAN, 1=MIXED, 2=BOT)
+REGIME_CODES: Dict[str, int] = {name: code for code, name in enumerate(REGIMES)}
+
+def _botscore_coded_params(r: BotScoreRow) -> Tuple:
+    return (r.ts, r.market_id, r.token_id, r.botscore, REGIME_CODES[r.regime])
+
+_SNAPSHOT_PLAN = _insert_plan("snapshots", SnapshotRow)
+_BOTSCORE_PLAN = _insert_plan("bot_scores", BotScoreRow, _botscore_coded_params)
+_BOTSCORE_TEXT_PLAN = _insert_plan("bot_scores", BotScoreRow)  # databases created with regime TEXT
+_SIGNAL_PLAN = _insert_plan("signals", SignalRow)
+
+# (name, table) of the (market_id, ts) lookup index on each table
+_INDEXES = (
+    ("idx_snap_mkt_ts", "snapshots"),
+    ("idx_bs_mkt_ts", "bot_scores"),
+    ("idx_sig_mkt_ts", "signals"),
+)
+
+def _create_indexes(cur: sqlite3.Cursor) -> None:
+    for name, table in _INDEXES:
+        cur.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table}(market_id, ts)")
+
 class Store:
     def __init__(self, path: str):
         self.path = path
+        # One connection for the store's lifetime; each insert_cycle() is one transaction on it
+        self._con = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()  # serializes writers sharing the connection
         self._init()
 
+    def close(self) -> None:
+        with self._lock:
+            self._con.close()
+
     def _init(self) -> None:
-        with sqlite3.connect(self.path) as con:
+        con = self._con
+        # Append-only research log: WAL with synchronous=NORMAL syncs at checkpoints
+        # rather than on every commit (journal_mode persists in the file itself)
+        con.execute("PRAGMA journal_mode=WAL")
+        con.execute("PRAGMA synchronous=NORMAL")
+        con.execute("PRAGMA temp_store=MEMORY")
+        con.execute("PRAGMA cache_size=-65536")  # KiB, i.e. 64 MiB
+        con.execute("PRAGMA mmap_size=268435456")
+        with con:
             cur = con.cursor()
             cur.execute("""
             CREATE TABLE IF NOT EXISTS snapshots (
@@ -64,7 +147,7 @@ class Store:
                 market_id TEXT,
                 token_id TEXT,
                 botscore REAL,
-                regime TEXT
+                regime INTEGER
             )""")
             cur.execute("""
             CREATE TABLE IF NOT EXISTS signals (
@@ -76,35 +159,62 @@ class Store:
                 strength REAL,
                 details TEXT
             )""")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_snap_mkt_ts ON snapshots(market_id, ts)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_bs_mkt_ts ON bot_scores(market_id, ts)")
-            cur.execute("CREATE INDEX IF NOT EXISTS idx_sig_mkt_ts ON signals(market_id, ts)")
-            con.commit()
+            _create_indexes(cur)
+            # Older databases keep their TEXT regime column and keep receiving labels
+            regime_type = next(row[2] for row in cur.execute("PRAGMA table_info(bot_scores)") if row[1] == "regime")
+            self._botscore_plan = _BOTSCORE_TEXT_PLAN if regime_type.upper() == "TEXT" else _BOTSCORE_PLAN
+
+    @contextmanager
+    def bulk_mode(self) -> Iterator[None]:
+        """
+        Drop the (market_id, ts) indexes for a historical backfill and rebuild them
+        once at the end, instead of maintaining them on every inserted row.
+        Live scanning should keep using the indexed tables directly.
+        """
+        con = self._con
+        with self._lock, con:
+            for name, _ in _INDEXES:
+                con.execute(f"DROP INDEX IF EXISTS {name}")
+        try:
+            yield
+        finally:
+            with self._lock, con:
+                _create_indexes(con.cursor())
 
     def now_ts(self) -> int:
         return int(time.time())
 
     def insert_snapshot(self, r: SnapshotRow) -> None:
-        with sqlite3.connect(self.path) as con:
-            con.execute(
-                "INSERT INTO snapshots VALUES (?,?,?,?,?,?,?,?,?,?,?)",
-                (r.ts, r.market_id, r.slug, r.token_id, r.vol24h, r.liquidity,
-                 r.mid, r.spread, r.depth5, r.ok_clob, r.restricted)
-            )
-            con.commit()
+        self.insert_snapshots((r,))
 
     def insert_botscore(self, r: BotScoreRow) -> None:
-        with sqlite3.connect(self.path) as con:
-            con.execute(
-                "INSERT INTO bot_scores VALUES (?,?,?,?,?)",
-                (r.ts, r.market_id, r.token_id, r.botscore, r.regime)
-            )
-            con.commit()
+        self.insert_botscores((r,))
 
     def insert_signal(self, r: SignalRow) -> None:
-        with sqlite3.connect(self.path) as con:
-            con.execute(
-                "INSERT INTO signals VALUES (?,?,?,?,?,?,?)",
-                (r.ts, r.market_id, r.token_id, r.strategy, r.signal, r.strength, r.details)
-            )
-            con.commit()
+        self.insert_signals((r,))
+
+    # Bulk inserts: batched multi-row INSERTs per table and one commit per call
+    def insert_snapshots(self, rows: Sequence[SnapshotRow]) -> None:
+        self.insert_cycle(snapshots=rows)
+
+    def insert_botscores(self, rows: Sequence[BotScoreRow]) -> None:
+        self.insert_cycle(botscores=rows)
+
+    def insert_signals(self, rows: Sequence[SignalRow]) -> None:
+        self.insert_cycle(signals=rows)
+
+    def insert_cycle(
+        self,
+        snapshots: Sequence[SnapshotRow] = (),
+        botscores: Sequence[BotScoreRow] = (),
+        signals: Sequence[SignalRow] = (),
+    ) -> None:
+        """Write one cycle's rows for all three tables in a single transaction."""
+        con = self._con
+        with self._lock, con:  # commits on success, rolls back on error
+            if snapshots:
+                _insert_many(con, _SNAPSHOT_PLAN, snapshots)
+            if botscores:
+                _insert_many(con, self._botscore_plan, botscores)
+            if signals:
+                _insert_many(con, _SIGNAL_PLAN, signals)
@@ -1,6 +1,6 @@
 """Strategy implementations: A2 cascade, H1 informational."""
 
-from .a2_cascade import A2State, A2Params, A2Signal, a2_detect
+from .a2_cascade import A2State, A2Params, A2Signal, a2_detect, A2BatchInputs, A2BatchSignal, a2_detect_batch
 from .h1_informational import H1Case, H1Decision, H1Checklist
 
 __all__ = [
@@ -8,6 +8,9 @@ __all__ = [
     "A2Params",
     "A2Signal",
     "a2_detect",
+    "A2BatchInputs",
+    "A2BatchSignal",
+    "a2_detect_batch",
     "H1Case",
     "H1Decision",
     "H1Checklist",
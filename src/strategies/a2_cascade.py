@@ -1,24 +1,44 @@
 from __future__ import annotations
 
+import math
 from dataclasses import dataclass
-from typing import Optional
+from typing import Optional, Tuple
 
+import numpy as np
 
-@dataclass
+# Reason bits returned by _a2_core
+SPREAD_EXPANSION = 0x1
+DEPTH_COLLAPSE = 0x2
+MID_JUMP = 0x4
+
+_REASON_NAMES = (
+    (SPREAD_EXPANSION, "SPREAD_EXPANSION"),
+    (DEPTH_COLLAPSE, "DEPTH_COLLAPSE"),
+    (MID_JUMP, "MID_JUMP"),
+)
+
+# details string for every possible mask, built once at import
+_REASON_STRINGS = tuple(
+    ",".join(name for bit, name in _REASON_NAMES if mask & bit)
+    for mask in range((SPREAD_EXPANSION | DEPTH_COLLAPSE | MID_JUMP) + 1)
+)
+
+
+@dataclass(slots=True)
 class A2State:
     last_mid: Optional[float] = None
     last_spread: Optional[float] = None
     last_depth5: Optional[float] = None
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class A2Params:
     spread_mult: float = 2.0
     depth_collapse: float = 0.60
     sigma_k: float = 2.0
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class A2Signal:
     fired: bool
     direction: Optional[str] = None
@@ -26,6 +46,72 @@ class A2Signal:
     details: str = ""
 
 
+@dataclass(frozen=True, slots=True)
+class A2BatchInputs:
+    """
+    Struct-of-arrays inputs for a2_detect_batch, one entry per market.
+    Missing values (no data / no history / no previous mid) are NaN.
+    """
+    curr_mid: np.ndarray
+    curr_spread: np.ndarray
+    curr_depth5: np.ndarray
+    med_spread: np.ndarray
+    med_depth5: np.ndarray
+    last_mid: np.ndarray
+
+
+@dataclass(frozen=True, slots=True)
+class A2BatchSignal:
+    fired: np.ndarray      # bool
+    direction: np.ndarray  # int8: +1 FADE_UP, -1 FADE_DOWN, 0 none
+    strength: np.ndarray   # float64
+    mask: np.ndarray       # uint8 reason bits (decode with reasons_from_mask)
+
+
+def reasons_from_mask(mask: int) -> str:
+    """Decode an A2 reason bitmask into the comma-separated details string."""
+    return _REASON_STRINGS[mask]
+
+
+def _a2_core(
+    curr_mid: float,
+    curr_spread: float,
+    curr_depth5: float,
+    med_spread: float,
+    med_depth5: float,
+    last_mid: float,
+    spread_mult: float,
+    depth_collapse: float,
+    sigma_k: float,
+) -> Tuple[int, int]:
+    """
+    Numeric core of the A2 detector on plain floats (last_mid is NaN when unknown).
+    Returns (conds, reason_mask).
+    """
+    conds = 0
+    mask = 0
+
+    # 1) Spread expansion
+    if med_spread > 0 and curr_spread >= spread_mult * med_spread:
+        conds += 1
+        mask |= SPREAD_EXPANSION
+
+    # 2) Depth collapse
+    if med_depth5 > 0 and curr_depth5 <= depth_collapse * med_depth5:
+        conds += 1
+        mask |= DEPTH_COLLAPSE
+
+    # 3) Mid jump (if we have previous mid)
+    if not math.isnan(last_mid):
+        dmid = abs(curr_mid - last_mid)
+        # Simple heuristic: if mid moved significantly relative to spread
+        if curr_spread > 0 and dmid >= sigma_k * curr_spread:
+            conds += 1
+            mask |= MID_JUMP
+
+    return conds, mask
+
+
 def a2_detect(
     curr_mid: Optional[float],
     curr_spread: Optional[float],
@@ -45,31 +131,16 @@ def a2_detect(
     if med_spread is None or med_depth5 is None:
         return A2Signal(fired=False, details="INSUFFICIENT_HISTORY")
     
-    reasons = []
-    conds = 0
-    
-    # 1) Spread expansion
-    if med_spread > 0 and curr_spread >= p.spread_mult * med_spread:
-        conds += 1
-        reasons.append("SPREAD_EXPANSION")
-    
-    # 2) Depth collapse
-    if med_depth5 > 0 and curr_depth5 <= p.depth_collapse * med_depth5:
-        conds += 1
-        reasons.append("DEPTH_COLLAPSE")
-    
-    # 3) Mid jump (if we have previous mid)
-    if state.last_mid is not None:
-        dmid = abs(curr_mid - state.last_mid)
-        # Simple heuristic: if mid moved significantly relative to spread
-        if curr_spread > 0 and dmid >= p.sigma_k * curr_spread:
-            conds += 1
-            reasons.append("MID_JUMP")
+    last_mid = math.nan if state.last_mid is None else state.last_mid
+    conds, mask = _a2_core(
+        curr_mid, curr_spread, curr_depth5, med_spread, med_depth5, last_mid,
+        p.spread_mult, p.depth_collapse, p.sigma_k,
+    )
     
     is_cascade = conds >= 2  # Require at least 2 conditions
     
     if not is_cascade:
-        return A2Signal(fired=False, details=",".join(reasons) if reasons else "NO_CASCADE")
+        return A2Signal(fired=False, details=_REASON_STRINGS[mask] if mask else "NO_CASCADE")
     
     # Direction: if mid rose, fade up (short); if fell, fade down (long)
     direction = None
@@ -82,5 +153,39 @@ def a2_detect(
         fired=True,
         direction=direction,
         strength=strength,
-        details=",".join(reasons)
+        details=_REASON_STRINGS[mask]
     )
+
+
+def a2_detect_batch(x: A2BatchInputs, p: A2Params) -> A2BatchSignal:
+    """
+    Vectorized a2_detect over many markets at once.
+    Row i matches a2_detect on the same inputs; rows with missing data or history never fire.
+    """
+    curr_mid = np.asarray(x.curr_mid, dtype=np.float64)
+    curr_spread = np.asarray(x.curr_spread, dtype=np.float64)
+    curr_depth5 = np.asarray(x.curr_depth5, dtype=np.float64)
+    med_spread = np.asarray(x.med_spread, dtype=np.float64)
+    med_depth5 = np.asarray(x.med_depth5, dtype=np.float64)
+    last_mid = np.asarray(x.last_mid, dtype=np.float64)
+
+    valid = ~(np.isnan(curr_mid) | np.isnan(curr_spread) | np.isnan(curr_depth5)
+              | np.isnan(med_spread) | np.isnan(med_depth5))
+    has_last = ~np.isnan(last_mid)
+
+    # NaN comparisons are False, so invalid rows fall out of every condition
+    c1 = (med_spread > 0) & (curr_spread >= p.spread_mult * med_spread)
+    c2 = (med_depth5 > 0) & (curr_depth5 <= p.depth_collapse * med_depth5)
+    dmid = curr_mid - last_mid
+    c3 = has_last & (curr_spread > 0) & (np.abs(dmid) >= p.sigma_k * curr_spread)
+
+    conds = c1.astype(np.int8) + c2 + c3
+    fired = valid & (conds >= 2)
+
+    mask = (c1 * SPREAD_EXPANSION | c2 * DEPTH_COLLAPSE | c3 * MID_JUMP).astype(np.uint8)
+    mask[~valid] = 0
+
+    direction = np.where(fired & has_last, np.where(dmid > 0, 1, -1), 0).astype(np.int8)
+    strength = np.where(fired, np.minimum(1.0, conds / 3.0), 0.0)
+
+    return A2BatchSignal(fired=fired, direction=direction, strength=strength, mask=mask)
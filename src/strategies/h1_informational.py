@@ -1,10 +1,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import List, Optional, Tuple
+from typing import List, Optional, Sequence, Tuple
 
+import numpy as np
 
-@dataclass
+
+@dataclass(slots=True)
 class H1Case:
     market_slug: str
     question: str
@@ -16,7 +18,7 @@ class H1Case:
     thesis_invalidation_rule: str
 
 
-@dataclass
+@dataclass(slots=True)
 class H1Decision:
     ok: bool
     reason: str
@@ -55,3 +57,40 @@ class H1Checklist:
             return H1Decision(True, "OK_NO_CATALYST_ASSUME_HOLD", p_model, edge)
 
         return H1Decision(True, "OK", p_model, edge)
+
+    def evaluate_batch(self, cases: Sequence[H1Case]) -> List[H1Decision]:
+        """
+        evaluate() over many cases; scenario totals, p_model and the edge gate
+        are computed on an (N_cases, max_scenarios) zero-padded array.
+        """
+        n = len(cases)
+        width = max((len(c.scenarios) for c in cases), default=0)
+        probs = np.zeros((n, width))
+        for i, case in enumerate(cases):
+            for j, (_, p) in enumerate(case.scenarios):
+                probs[i, j] = p
+        totals = probs.sum(axis=1)
+        p_market = np.fromiter((c.p_market for c in cases), dtype=np.float64, count=n)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            p_model = totals / totals  # same normalization as evaluate()
+        edge = np.abs(p_model - p_market)
+        edge_ok = edge >= self.min_edge
+
+        out: List[H1Decision] = []
+        for i, case in enumerate(cases):
+            if not case.resolution_source_defined:
+                out.append(H1Decision(False, "NO_RESOLUTION_SOURCE", None, None))
+            elif not case.wording_is_unambiguous:
+                out.append(H1Decision(False, "WORDING_AMBIGUOUS", None, None))
+            elif not case.scenarios:
+                out.append(H1Decision(False, "NO_SCENARIOS", None, None))
+            elif totals[i] <= 0:
+                out.append(H1Decision(False, "INVALID_SCENARIO_PROBS", None, None))
+            elif not edge_ok[i]:
+                out.append(H1Decision(False, "EDGE_TOO_SMALL", float(p_model[i]), float(edge[i])))
+            elif not case.catalyst_defined and "resolution" not in case.thesis_invalidation_rule.lower():
+                out.append(H1Decision(True, "OK_NO_CATALYST_ASSUME_HOLD", float(p_model[i]), float(edge[i])))
+            else:
+                out.append(H1Decision(True, "OK", float(p_model[i]), float(edge[i])))
+        return out